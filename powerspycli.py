@@ -32,6 +32,15 @@ import time    # sleep/time
 import errno   # IOError numbers
 import codecs  # for hex decoder
 import csv     # for csv handling
+import gzip    # compressed csv segments
+import json    # segments manifest
+import os      # atomic rename of segments
+import queue   # rows handed over to the writer thread
+import threading # capture, csv writer and daemon threads
+import bisect       # search in the samples ring buffer
+import collections  # samples ring buffer
+import socketserver # daemon control API
+import stat         # check the daemon socket path
 
 # All powerspy commands
 CMD_ID = '?'
@@ -66,8 +75,22 @@ allmetrics = False
 # Variable to identify if GUI or CLI running
 is_gui = False
 
+# Variable to identify if running as a headless daemon
+is_daemon = False
+
 # Constants
 DEFAULT_TIMEOUT = 3.0 # secs (float allowed, timeout to receive response from PowerSpy, except in realtime mode)
+CSV_HEADER = ["Timestamp", "Power"]
+SEGMENT_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+DEFAULT_SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "powerspycli.sock")
+DEFAULT_BUFFER = 86400 # samples kept by the daemon (one day at one sample per second)
+RT_DIGITS = (8, 8, 8, 4, 4) # hex digits of each realtime frame field
+RT_FIELDS = len(RT_DIGITS)
+RT_FRAME_MAX = 40     # longest frame content kept for the rejected frames log (valid frames are 37 with '>')
+RT_RECV_SIZE = 256    # bytes read from the socket at once in realtime mode
+
+# Value of each hex digit character, -1 for any other byte
+HEX_VALUES = [int(chr(c), 16) if chr(c) in "0123456789ABCDEFabcdef" else -1 for c in range(256)]
 
 decode_hex = codecs.getdecoder("hex_codec")
 
@@ -261,6 +284,332 @@ class PSCGUI:
   def run(self):
     self.root.mainloop()
 
+#-------------------------------------------------------------------------------------------
+# CSV writer class
+#-------------------------------------------------------------------------------------------
+
+# zstd module: compression.zstd (Python 3.14+) or the zstandard module
+def zstd_module():
+  try:
+    from compression import zstd
+  except ImportError:
+    import zstandard as zstd
+  return zstd
+
+class CSVWriter:
+  """Write power rows to a CSV file from a background thread.
+
+  Without rotation nor compression, rows are appended to filename as before.
+  Otherwise, rows are written to numbered segments (e.g. file.00000.csv.gz)
+  listed with their time ranges and compression in file.manifest.json.
+  A segment is written as .part and renamed once complete. Segments left by
+  a previous capture (complete or .part) are never overwritten.
+  """
+  def __init__(self, filename, rotate_size=0, rotate_time=0, compress=None):
+    self.filename = filename
+    self.rotate_size = rotate_size # bytes of CSV data per segment (0 to disable)
+    self.rotate_time = rotate_time # seconds per segment (0 to disable)
+    self.compress = compress
+    self.segmented = rotate_size > 0 or rotate_time > 0 or compress is not None
+    stem, ext = os.path.splitext(filename)
+    self.stem = stem
+    self.ext = ext if ext != "" else ".csv"
+    self.manifest_path = stem + ".manifest.json"
+    self.manifest = {"version": 1, "columns": CSV_HEADER, "segments": []}
+    self.index = 0 # number of the next segment
+    self.file = None
+    self.writer = None
+    self.segment = None
+    self.rows = queue.Queue()
+    self.thread = None
+    self.failed = False # set by the writer thread on write error
+
+  def start(self):
+    if self.segmented:
+      if os.path.exists(self.manifest_path):
+        # Keep the segments of a previous capture
+        try:
+          with open(self.manifest_path) as f:
+            self.manifest["segments"] = json.load(f)["segments"]
+        except (ValueError, KeyError, OSError) as e:
+          logging.error("Cannot resume manifest %s (%s)" % (self.manifest_path, e))
+          return False
+      try:
+        self.index = self.next_index()
+      except OSError as e:
+        logging.error("Cannot list segments of %s (%s)" % (self.filename, e))
+        return False
+    self.thread = threading.Thread(target=self.run, daemon=True)
+    self.thread.start()
+    return True
+
+  # Number after any existing segment, including .part files of an interrupted capture
+  def next_index(self):
+    directory = os.path.dirname(self.stem) or "."
+    pattern = re.compile(re.escape(os.path.basename(self.stem)) + r"\.(\d+)" + re.escape(self.ext))
+    index = len(self.manifest["segments"])
+    for name in os.listdir(directory):
+      mat = pattern.match(name)
+      if mat:
+        if name.endswith(".part"):
+          logging.warning("Keeping unfinished segment %s of a previous capture" % name)
+        index = max(index, int(mat.group(1)) + 1)
+    return index
+
+  # Queue a row, returns False if rows can no longer be saved
+  def write(self, timestamp, power):
+    if self.failed:
+      return False
+    self.rows.put((timestamp, power))
+    return True
+
+  def close(self):
+    if self.thread is not None:
+      self.rows.put(None)
+      self.thread.join()
+      self.thread = None
+
+  def run(self):
+    while True:
+      row = self.rows.get()
+      if row is None:
+        break
+      if self.failed:
+        continue
+      try:
+        self.write_row(row[0], row[1])
+      except Exception as e:
+        logging.error("Cannot write to %s (%s)" % (self.filename, e))
+        self.failed = True
+    try:
+      self.close_segment(complete=not self.failed)
+    except Exception as e:
+      logging.error("Cannot close %s (%s)" % (self.filename, e))
+
+  def write_row(self, timestamp, power):
+    if self.file is not None and self.segmented and self.must_rotate(timestamp):
+      self.close_segment()
+    if self.file is None:
+      self.open_segment(timestamp)
+    line = ['{:.0f}'.format(timestamp), '{:.3f}'.format(power)]
+    self.writer.writerow(line)
+    if self.segmented:
+      self.segment["end"] = int(round(timestamp))
+      self.segment["rows"] += 1
+      self.segment["bytes"] += len(line[0]) + len(line[1]) + 3
+    else:
+      self.file.flush()
+
+  def must_rotate(self, timestamp):
+    if self.rotate_size > 0 and self.segment["bytes"] >= self.rotate_size:
+      return True
+    if self.rotate_time > 0 and timestamp - self.segment["time"] >= self.rotate_time:
+      return True
+    return False
+
+  def open_segment(self, timestamp):
+    if not self.segmented:
+      self.file = open(self.filename, "a+", newline='')
+      self.file.seek(0)
+      self.writer = csv.writer(self.file, delimiter=';', quoting=csv.QUOTE_NONE)
+      if self.file.read(1) == "":
+        self.writer.writerow(CSV_HEADER)
+      return
+    path = "%s.%05d%s%s" % (self.stem, self.index, self.ext, SEGMENT_SUFFIXES[self.compress])
+    self.index += 1
+    if self.compress == "gzip":
+      self.file = gzip.open(path + ".part", "wt", newline='')
+    elif self.compress == "zstd":
+      self.file = zstd_module().open(path + ".part", "wt", newline='')
+    else:
+      self.file = open(path + ".part", "w", newline='')
+    self.writer = csv.writer(self.file, delimiter=';', quoting=csv.QUOTE_NONE)
+    self.writer.writerow(CSV_HEADER)
+    self.segment = {"path": path, "time": timestamp, "start": int(round(timestamp)),
+                    "end": int(round(timestamp)), "rows": 0, "bytes": 0}
+
+  # Close the current segment, and publish it only if complete (otherwise it stays as .part)
+  def close_segment(self, complete=True):
+    if self.file is None:
+      return
+    file = self.file
+    self.file = None
+    self.writer = None
+    file.close()
+    if not self.segmented:
+      return
+    if not complete:
+      logging.error("Segment %s is incomplete and left as .part" % self.segment["path"])
+      self.segment = None
+      return
+    # Switch atomically: readers only ever see complete segments
+    path = self.segment["path"]
+    os.replace(path + ".part", path)
+    self.manifest["segments"].append({
+      "file": os.path.basename(path),
+      "start": self.segment["start"],
+      "end": self.segment["end"],
+      "rows": self.segment["rows"],
+      "compression": self.compress,
+    })
+    self.segment = None
+    with open(self.manifest_path + ".part", "w") as f:
+      json.dump(self.manifest, f, indent=2)
+    os.replace(self.manifest_path + ".part", self.manifest_path)
+
+#-------------------------------------------------------------------------------------------
+# Daemon class
+#-------------------------------------------------------------------------------------------
+
+class PSCDaemonHandler(socketserver.StreamRequestHandler):
+  # One command per line, one JSON response per line
+  def handle(self):
+    for line in self.rfile:
+      response = self.server.pscdaemon.command(line.decode(errors='replace').split())
+      self.wfile.write((json.dumps(response) + "\n").encode())
+
+class PSCDaemon:
+  """Keep the PowerSpy capture running and answer commands on a Unix socket.
+
+  Commands: latest, status, energy T, start NAME, stop NAME, shutdown.
+  Samples are kept in a ring buffer along with the energy consumed since the
+  daemon started, so energy over any period is a difference of two samples.
+  """
+  def __init__(self, powerspy_, path=DEFAULT_SOCKET, size=DEFAULT_BUFFER):
+    self.powerspy = powerspy_
+    self.path = path
+    # (timestamp, voltage, current, power, pvoltage, pcurrent, energy)
+    self.samples = collections.deque(maxlen=size)
+    self.energy = 0.0 # joules since the first sample
+    self.segments = {}
+    self.lock = threading.Lock()
+    self.server = None
+    self.thread = None
+
+  def start(self):
+    if os.path.exists(self.path):
+      if not stat.S_ISSOCK(os.stat(self.path).st_mode):
+        logging.error("%s exists and is not a socket" % self.path)
+        return False
+      # Remove the socket left by a daemon that did not exit properly
+      client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+      try:
+        client.connect(self.path)
+        logging.error("A daemon is already listening on %s" % self.path)
+        return False
+      except OSError:
+        pass
+      finally:
+        client.close()
+      try:
+        os.unlink(self.path)
+      except OSError as e:
+        logging.error("Cannot remove stale socket %s (%s)" % (self.path, e))
+        return False
+    try:
+      self.server = socketserver.ThreadingUnixStreamServer(self.path, PSCDaemonHandler)
+    except OSError as e:
+      logging.error("Cannot listen on %s (%s)" % (self.path, e))
+      return False
+    self.server.daemon_threads = True
+    self.server.pscdaemon = self
+    self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    self.thread.start()
+    return True
+
+  def stop(self):
+    if self.server is not None:
+      self.server.shutdown()
+      self.server.server_close()
+      self.server = None
+      try:
+        os.unlink(self.path)
+      except OSError as e:
+        logging.warning("Cannot remove socket %s (%s)" % (self.path, e))
+
+  def add_sample(self, timestamp, voltage, current, power, pvoltage, pcurrent):
+    with self.lock:
+      if self.samples:
+        # Trapezoidal integration between the previous sample and this one
+        previous = self.samples[-1]
+        self.energy += (previous[3] + power) / 2.0 * (timestamp - previous[0])
+      self.samples.append((timestamp, voltage, current, power, pvoltage, pcurrent, self.energy))
+
+  def command(self, args):
+    if len(args) == 0:
+      return {"error": "empty command"}
+    with self.lock:
+      if len(self.samples) == 0 and args[0] in ("latest", "energy", "start", "stop"):
+        return {"error": "no sample yet"}
+      try:
+        if args[0] == "latest" and len(args) == 1:
+          return self.latest()
+        if args[0] == "status" and len(args) == 1:
+          return self.status()
+        if args[0] == "energy" and len(args) == 2:
+          timestamp = float(args[1])
+          if not math.isfinite(timestamp):
+            raise ValueError(args[1])
+          return self.energy_since(timestamp)
+        if args[0] == "start" and len(args) == 2:
+          return self.start_segment(args[1])
+        if args[0] == "stop" and len(args) == 2:
+          return self.stop_segment(args[1])
+        if args[0] == "shutdown" and len(args) == 1:
+          self.powerspy.running = False
+          return {"shutdown": True}
+      except ValueError:
+        return {"error": "invalid argument: %s" % args[1]}
+    return {"error": "unknown command: %s" % " ".join(args)}
+
+  def latest(self):
+    sample = self.samples[-1]
+    return {"timestamp": sample[0], "voltage": sample[1], "current": sample[2],
+            "power": sample[3], "pvoltage": sample[4], "pcurrent": sample[5]}
+
+  def status(self):
+    return {"samples": len(self.samples), "since": self.samples[0][0] if self.samples else None,
+            "rejected": self.powerspy.rt_rejected, "segments": sorted(self.segments)}
+
+  # Energy (joules) from the first sample at or after timestamp to the latest sample
+  def energy_since(self, timestamp):
+    i = bisect.bisect_left(self.samples, (timestamp,))
+    if i == len(self.samples):
+      i -= 1
+    first = self.samples[i]
+    last = self.samples[-1]
+    return {"energy": last[6] - first[6], "start": first[0], "end": last[0],
+            "truncated": timestamp < self.samples[0][0]}
+
+  def start_segment(self, name):
+    if name in self.segments:
+      return {"error": "segment already started: %s" % name}
+    sample = self.samples[-1]
+    self.segments[name] = (sample[0], sample[6])
+    return {"segment": name, "start": sample[0]}
+
+  def stop_segment(self, name):
+    if name not in self.segments:
+      return {"error": "unknown segment: %s" % name}
+    start, energy = self.segments.pop(name)
+    sample = self.samples[-1]
+    duration = sample[0] - start
+    energy = sample[6] - energy
+    return {"segment": name, "start": start, "end": sample[0], "duration": duration,
+            "energy": energy, "power": energy / duration if duration > 0 else sample[3]}
+
+# Send a command to a running daemon and return its JSON response
+def daemon_command(path, args):
+  client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  client.settimeout(DEFAULT_TIMEOUT)
+  try:
+    client.connect(path)
+    client.sendall((" ".join(args) + "\n").encode())
+    with client.makefile('rb') as f:
+      return json.loads(f.readline())
+  finally:
+    client.close()
+
 #-------------------------------------------------------------------------------------------
 # PowerSpy class
 #-------------------------------------------------------------------------------------------
@@ -279,6 +628,12 @@ class PowerSpy:
     self.frequency = None
     self.max_avg_period = None
     self.running = True
+    # Realtime frames parser buffers (allocated once, reused for every frame)
+    self.rt_buffer = bytearray(RT_RECV_SIZE)
+    self.rt_pos = self.rt_len = 0
+    self.rt_frame = bytearray(RT_FRAME_MAX)
+    self.rt_values = [0] * RT_FIELDS
+    self.rt_rejected = 0 # corrupted frames dropped since rt_start()
 
   def connect(self, address):
     if self.sock != None:
@@ -484,34 +839,94 @@ class PowerSpy:
     if a != CMD_OK:
       logging.error('CMD_RT FAILED')
       return False
+    self.rt_pos = self.rt_len = 0
+    self.rt_rejected = 0
     return True
 
-  # Read monitored values and display them
+  # Drop a corrupted realtime frame (n bytes received after its '<')
+  def rt_reject(self, n):
+    self.rt_rejected += 1
+    logging.debug("Rejected frame #%d: <%s" % (self.rt_rejected, self.rt_frame[:min(n, RT_FRAME_MAX)].decode('ascii', 'replace')))
+
+  # Read the next valid realtime frame and return its raw values (None on socket error or stop)
+  # Frames are <XXXXXXXX XXXXXXXX XXXXXXXX XXXX XXXX> (hex digits of each field in RT_DIGITS).
+  # Any unexpected byte rejects the frame, and the parser waits for the next '<' to resynchronize.
+  def rt_next_frame(self):
+    buf = self.rt_buffer
+    frame = self.rt_frame
+    values = self.rt_values
+    in_frame = False
+    n = field = digits = value = 0
+    while self.running:
+      if self.rt_pos == self.rt_len:
+        try:
+          self.rt_len = self.sock.recv_into(buf)
+        except socket.timeout:
+          # No data yet, the caller retries
+          logging.warning("Timeout while receiving realtime data")
+          if in_frame:
+            # The rest of this frame is lost
+            self.rt_reject(n)
+          self.rt_pos = self.rt_len = 0
+          return None
+        except OSError as err:
+          if in_frame:
+            self.rt_reject(n)
+          if err.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+            logging.debug("EAGAIN or EWOULDBLOCK due to signal interrupt. Try to quit.")
+          else:
+            logging.error("Socket error while receiving realtime data: %s" % err)
+          self.running = False
+          self.rt_pos = self.rt_len = 0
+          return None
+        self.rt_pos = 0
+        if self.rt_len == 0:
+          logging.error("Connection closed by the device")
+          self.running = False
+          return None
+      b = buf[self.rt_pos]
+      self.rt_pos += 1
+      if b == 0x3C: # '<'
+        if in_frame:
+          # Start of a new frame inside the current one: resynchronize on it
+          self.rt_reject(n)
+        in_frame = True
+        n = field = digits = value = 0
+        continue
+      if not in_frame:
+        # End of line or garbage between frames
+        continue
+      if n < RT_FRAME_MAX:
+        frame[n] = b
+      n += 1
+      d = HEX_VALUES[b]
+      if d >= 0 and digits < RT_DIGITS[field]:
+        value = (value << 4) | d
+        digits += 1
+      elif b == 0x20 and field < RT_FIELDS - 1 and digits == RT_DIGITS[field]: # ' '
+        values[field] = value
+        field += 1
+        digits = value = 0
+      elif b == 0x3E and field == RT_FIELDS - 1 and digits == RT_DIGITS[field]: # '>'
+        values[field] = value
+        return values
+      else:
+        self.rt_reject(n)
+        in_frame = False
+    return None
+
+  # Read monitored values (None if no valid frame could be read)
   def rt_read(self):
     # Periodically read the input
-    res = self.recvCmd(40) # 38 without the end of line or 40 with
     # RMS (Root Mean Square)
     # square of the RMS voltage (8 hex digits)
     # square of the RMS current (8 hex digits)
     # square of the RMS power (8 hex digits)
     # peak voltage (4 hex digits)
     # peak current (4 hex digits)
-    values = res.split()
-    # Should be an array of 5 elements
-    if len(values) != 5:
-      logging.warning("Invalid response")
-      return [0,0,0,0,0]
-    # convert string to values
-    conv = []
-    for i in range(5):
-      hexa = decode_hex(values[i])[0]
-      if len(hexa) == 2:
-        fmt = '>H'
-      elif len(hexa) == 4:
-        fmt = '>I'
-      else:
-        logging.error("Invalid data %d %s" % (len(hexa), hexa))
-      conv.insert(i, struct.unpack(fmt, hexa)[0])
+    conv = self.rt_next_frame()
+    if conv is None:
+      return None
 
     # Note: Initially scale_factory and scale_current are the same but in case of user calibration, scale_current must be used
     # Corrected RMS voltage = squareroot [ (square of the RMS voltage returned by fonction) x (Uscale_current)2 ]
@@ -531,6 +946,8 @@ class PowerSpy:
   def rt_stop(self):
     # Reset the timeout to default
     self.sock.settimeout(DEFAULT_TIMEOUT)
+    if self.rt_rejected > 0:
+      logging.warning("%d corrupted realtime frames were rejected" % self.rt_rejected)
     # TODO can check status before to stop
     self.sendCmd(CMD_RT_STOP)
     # flush input because it can have still data to read
@@ -545,7 +962,8 @@ class PowerSpy:
 
   # Display measurements every 1 second
   # If interval is higher than the PowerSpy device capacity, it will be an average of the averaged PowerSpy measurements
-  def rt_capture(self, filename=""):
+  # Optionally rotate the CSV file every rotate_size bytes or rotate_time seconds, and compress it (gzip or zstd)
+  def rt_capture(self, filename="", rotate_size=0, rotate_time=0, compress=None):
     if not self.acquisition_start():
       logging.error('Acquisition failed')
       return
@@ -565,31 +983,31 @@ class PowerSpy:
       self.acquisition_stop()
       return
 
-    if not is_gui:
+    if not is_gui and not is_daemon:
       if allmetrics:
         print("# Timestamp\tV\tA\tW\tV\tA")
       else:
         print("# Timestamp\tW")
 
-    # Save to CSV file
-    global writer, file
-    if filename != "":
-      file = open(filename, "a+", newline='')
-      file.seek(0)
-      writer = csv.writer(file, delimiter=';', quoting=csv.QUOTE_NONE)
-      if file.read(1) == "":
-        writer.writerow(["Timestamp", "Power"])
-
     # TODO to pythonify
     voltages = []
     currents = []
     powers = []
     pvoltages = []
     pcurrents = []
+    writer = None
     try:
+      # Save to CSV file (rows are written and compressed by the writer thread)
+      if filename != "":
+        writer = CSVWriter(filename, rotate_size, rotate_time, compress)
+        if not writer.start():
+          return
+
       while self.running:
-        voltage, current, power, pvoltage, pcurrent = self.rt_read()
-        # TODO should we check if rt_read returns [0,0,0,0,0] or None?
+        values = self.rt_read()
+        if values is None:
+          continue
+        voltage, current, power, pvoltage, pcurrent = values
         if every != 0:
           voltages.append(voltage)
           currents.append(current)
@@ -609,31 +1027,33 @@ class PowerSpy:
           pvoltages = []
           pcurrents = []
 
+        now = time.time()
         if is_gui:
           # Write to GUI
-          self.gui.update_data_fields(f"{time.time():0.0f}", f"{power:.3f}")
+          self.gui.update_data_fields(f"{now:0.0f}", f"{power:.3f}")
+        elif is_daemon:
+          # Keep in the daemon ring buffer
+          self.daemon.add_sample(now, voltage, current, power, pvoltage, pcurrent)
         else:
           # Write to terminal
           if allmetrics:
             # Write all metrics
             sys.stdout.write("\r%0.0f\t%0.3f\t%0.3f\t%0.3f\t%0.3f\t%0.3f          " % (
-            time.time(), voltage, current, power, pvoltage, pcurrent))
+            now, voltage, current, power, pvoltage, pcurrent))
           else:
             # Write only power
-            sys.stdout.write("\r%0.0f\t%0.3f     " % (time.time(), power))
+            sys.stdout.write("\r%0.0f\t%0.3f     " % (now, power))
 
         # Save to CSV file
-        if filename != "":
-          writer.writerow(['{:.0f}'.format(time.time()), '{:.3f}'.format(power)])
-          file.flush()
-          
+        if writer is not None and not writer.write(now, power):
+          logging.error("Stopping capture: power data can no longer be saved to %s" % filename)
+          self.running = False
+
     except Exception as e:
       logging.error("Realtime capture failed (%s)" % e)
-      if filename != "":
-        file.close()
     finally:
-      if filename != "":
-        file.close()
+      if writer is not None:
+        writer.close()
       self.rt_stop()
       self.acquisition_stop()
 
@@ -641,6 +1061,19 @@ class PowerSpy:
   def exit_gracefully(self, signal, frame):
     self.running = False
 
+# Megabytes to bytes, at least 1 byte
+def megabytes(value):
+  number = int(float(value) * 1000000)
+  if number < 1:
+    raise argparse.ArgumentTypeError("must be at least 1 byte: %s" % value)
+  return number
+
+def positive_int(value):
+  number = int(value)
+  if number < 1:
+    raise argparse.ArgumentTypeError("must be at least 1: %s" % value)
+  return number
+
 def is_valid_mac(address):
   address_regex = re.compile(r"""
       (^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$) |  # 00:1A:2B:3C:4D:5E or 00-1A-2B-3C-4D-5E
@@ -661,17 +1094,42 @@ if __name__ == '__main__':
   parser.add_argument('-a', '--allmetrics', action='store_true', help='Show all metrics.')
   parser.add_argument('-f', '--file', type=str, nargs='?', const="powerspy_"+str(int(time.time()))+".csv", default=None,
   help='Name of csv file to store power data. If used without argument, a default name is assigned.')
+  parser.add_argument('--rotate-size', metavar='MB', type=megabytes, default=0,
+  help='Start a new csv segment every MB megabytes of csv data.')
+  parser.add_argument('--rotate-time', metavar='SECONDS', type=positive_int, default=0,
+  help='Start a new csv segment every SECONDS seconds.')
+  parser.add_argument('--compress', choices=['gzip', 'zstd'], default=None,
+  help='Compress csv segments with gzip or zstd.')
+  parser.add_argument('-d', '--daemon', action='store_true',
+  help='Run headless and answer commands on a local Unix socket.')
+  parser.add_argument('-s', '--socket', metavar='PATH', default=DEFAULT_SOCKET,
+  help='Unix socket of the daemon (default: %s).' % DEFAULT_SOCKET)
+  parser.add_argument('--buffer', metavar='SAMPLES', type=positive_int, default=DEFAULT_BUFFER,
+  help='Number of samples kept by the daemon (default: %d).' % DEFAULT_BUFFER)
+  parser.add_argument('-c', '--client', metavar='CMD', nargs='+',
+  help='Send a command to a running daemon: latest, status, energy T, start NAME, stop NAME or shutdown.')
 
   args = parser.parse_args()
 
-  if args.gui:
+  if args.file is None and (args.rotate_size or args.rotate_time or args.compress):
+    parser.error("--rotate-size, --rotate-time and --compress require -f")
+
+  if args.client:
+    # Ask the running daemon, without connecting to the device
+    try:
+      response = daemon_command(args.socket, args.client)
+    except (OSError, ValueError) as e:
+      print("Cannot reach the daemon on %s (%s)" % (args.socket, e))
+      sys.exit(1)
+    print(json.dumps(response))
+    sys.exit(1 if "error" in response else 0)
+  elif args.gui:
     # Import GUI modules
     # For the GUI interface
     import ttkbootstrap as ttk
     import tkinter as tk
     from tkinter import filedialog, messagebox
     from ttkbootstrap.constants import *
-    import threading
 
     # Start GUI
     is_gui = True
@@ -685,6 +1143,10 @@ if __name__ == '__main__':
       print("MAC address is not valid: %s" % args.devicemac)
       sys.exit(1)
 
+    if args.daemon and not hasattr(socket, "AF_UNIX"):
+      print("Daemon mode requires Unix sockets")
+      sys.exit(1)
+
     print("Please wait while connecting and getting data from PowerSpy")
 
     if args.verbose:
@@ -694,10 +1156,19 @@ if __name__ == '__main__':
     if args.allmetrics:
         allmetrics = True
 
+    if args.compress == "zstd":
+      try:
+        zstd_module()
+      except ImportError:
+        print("zstd compression requires Python 3.14 or the zstandard module")
+        sys.exit(1)
+
     dev = PowerSpy()
 
     # Setup signal handler for CTRL-C
     signal.signal(signal.SIGINT, lambda s, f: dev.exit_gracefully(s, f))
+    if args.daemon:
+      signal.signal(signal.SIGTERM, lambda s, f: dev.exit_gracefully(s, f))
 
     # TODO set port to 1 but can be different?
     port = 1
@@ -713,6 +1184,20 @@ if __name__ == '__main__':
     if args.file is None:
           args.file = ""
 
-    dev.rt_capture(args.file)
+    if args.daemon:
+      # Start the control API, samples are added by rt_capture
+      is_daemon = True
+      daemon = PSCDaemon(dev, args.socket, args.buffer)
+      dev.daemon = daemon
+      if not daemon.start():
+        dev.close()
+        sys.exit(1)
+      print("Listening on %s" % args.socket)
+
+    try:
+      dev.rt_capture(args.file, args.rotate_size, args.rotate_time, args.compress)
+    finally:
+      if args.daemon:
+        daemon.stop()
 
     dev.close()